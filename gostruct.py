@@ -1,23 +1,44 @@
-"""Golang structures."""
-from typing import List
+"""
+Golang structures.
 
+The module is fully annotated so it can be compiled with mypyc
+(``mypyc gostruct.py``), the compiled extension is then imported in
+place of this file.
+"""
+import sys
+from typing import Any, Dict, Final, List, Optional
 
-structs = {}
 
-type_zeros = {
+type_zeros: Dict[str, object] = {
     "string": "",
     "int": 0,
     "float64": 0.0,
     "bool": "false",
 }
 
-ptr_func = {
+ptr_func: Dict[str, str] = {
     "int": "IntPtr",
     "float64": "Float64Ptr",
     "string": "StringPtr",
     "bool": "BoolPtr",
 }
 
+# Field kinds, decide how test data of a field is emitted.
+KIND_STR: Final = 0
+KIND_BOOL: Final = 1
+KIND_INT: Final = 2
+KIND_FLOAT: Final = 3
+KIND_MAP: Final = 4
+KIND_SLICE: Final = 5
+KIND_STRUCT: Final = 6
+
+base_kinds: Dict[str, int] = {
+    "string": KIND_STR,
+    "bool": KIND_BOOL,
+    "int": KIND_INT,
+    "float64": KIND_FLOAT,
+}
+
 
 class Type(object):
     """
@@ -25,10 +46,11 @@ class Type(object):
     """
 
     def __init__(self, cur: str = "", sub: str = ""):
-        self.cur = cur
-        self.sub = sub
+        # The same few type names repeat across all fields.
+        self.cur = sys.intern(cur)
+        self.sub = sys.intern(sub)
 
-    def is_base_type(self):
+    def is_base_type(self) -> bool:
         """
         Returns whether the type is a base type or not.
 
@@ -43,13 +65,62 @@ class Field(object):
     The field of a struct.
     """
 
-    def __init__(self, name: str = "", typ: Type = None,
-                 json_name: str = "", tag: str = "", required=""):
+    def __init__(self, name: str = "", typ: Optional[Type] = None,
+                 json_name: str = "", tag: str = "", required: str = ""):
         self.name = name
         self.type = typ
         self.json_name = json_name
         self.tag = tag
         self.required = required
+        self.kind: Optional[int] = None
+        self.zero = ""
+        self.ptr_open = ""
+        self.ptr_close = ""
+        # Element type of slices.
+        self.sub_type = ""
+        # Resolved on first use, the referenced struct may be declared later.
+        self.sub_struct: Optional[Struct] = None
+        # Literal of the referenced struct without test data.
+        self.sub_empty = ""
+        if typ:
+            self._describe(typ)
+
+    def _describe(self, typ: Type) -> None:
+        """
+        Precompute how the test data of the field is emitted.
+        """
+        cur = typ.cur
+        if typ.is_base_type():
+            self.kind = base_kinds[cur]
+            self.zero = str(type_zeros[cur])
+            if self.required == "omitempty":
+                self.ptr_open = ptr_func[cur] + "("
+                self.ptr_close = ")"
+        elif cur == "map[string]string":
+            self.kind = KIND_MAP
+        elif cur.startswith("[]"):
+            self.kind = KIND_SLICE
+            self.sub_type = typ.sub
+        else:
+            self.kind = KIND_STRUCT
+
+    def resolve(self, structs: Dict[str, "Struct"]) -> None:
+        """
+        Resolve the struct referenced by the field, if any.
+
+        :param structs: the known structs by name
+        """
+        if self.type is None:
+            return
+        if self.kind == KIND_SLICE:
+            self.sub_struct = structs.get(self.sub_type)
+        elif self.kind == KIND_STRUCT:
+            sub_struct = structs[self.type.cur]
+            self.sub_struct = sub_struct
+            if self.required == "omitempty":
+                self.sub_empty = sub_struct._empty_optional
+            else:
+                self.sub_empty = sub_struct._empty_required
 
 
 class Struct(object):
@@ -57,12 +128,32 @@ class Struct(object):
     The go struct.
     """
 
-    def __init__(self, name: str = "", fields: List[Field] = None):
+    def __init__(self, name: str = "", fields: Optional[List[Field]] = None):
         self.name = name
-        self.fields = fields
+        self.fields: List[Field] = fields if fields is not None else []
+        self.compiled = False
+        self.prefix = ""
+        self.field_prefixes: List[str] = []
+        # Literals of the struct without test data.
+        self._empty_required = "\t" + name + "{}"
+        self._empty_optional = "\t&" + name + "{}"
+
+    def compile(self, structs: Dict[str, "Struct"]) -> None:
+        """
+        Resolve the structs referenced by the fields and precompute the
+        fixed parts of the struct literal, so only the values are built per test case.
+
+        :param structs: the known structs by name
+        """
+        for field in self.fields:
+            field.resolve(structs)
+        self.prefix = self.name + "{\n"
+        self.field_prefixes = [f"\t{field.name}: " for field in self.fields]
+        self.compiled = True
 
 
-def build_go_data(required: str, struct: Struct, data: dict):
+def build_go_data(required: str, struct: Optional[Struct], data: Any,
+                  structs: Dict[str, Struct], out: Optional[List[str]] = None) -> Optional[str]:
     """
     This function takes in a required field, a struct, and a data dictionary.
     If the required field is "omitempty", the function prepends an "&" to the variable name.
@@ -72,84 +163,89 @@ def build_go_data(required: str, struct: Struct, data: dict):
     :param required: the required field of the struct
     :param struct: the struct to be initialized
     :param data: the data dictionary
+    :param structs: the known structs by name, used to resolve nested structs
+    :param out: optional list the code fragments are appended to, nothing is returned if given
     :return: the initialized struct
     """
+    if out is not None:
+        _build_go_data(required, struct, data, structs, out)
+        return None
+    parts: List[str] = []
+    _build_go_data(required, struct, data, structs, parts)
+    return "".join(parts)
+
+
+def _build_go_data(required: str, struct: Optional[Struct], data: Any,
+                   structs: Dict[str, Struct], out: List[str]) -> None:
+    """
+    Append the Go literal of the struct to out, see build_go_data.
+    """
     if not struct:
-        return ""
-    code = "\t"
-    if required == "omitempty":
-        code += "&"
+        return
     if not data:
-        return code + struct.name+"{}"
-    code += struct.name + "{\n"
-    for field in struct.fields:
+        out.append(struct._empty_optional if required == "omitempty" else struct._empty_required)
+        return
+    if not struct.compiled:
+        struct.compile(structs)
+    out.append("\t&" if required == "omitempty" else "\t")
+    out.append(struct.prefix)
+    for prefix, field in zip(struct.field_prefixes, struct.fields):
         sub_data = data.get(field.json_name)
-        code += f"\t{field.name}: "
-        if field.type.is_base_type():
-            cur_code = ""
-            if field.required == "omitempty":
-                cur_code += ptr_func[field.type.cur]+"("
-            if field.type.cur == "string":
-                cur_code += f" \"{sub_data or type_zeros[field.type.cur]}\""
-            elif field.type.cur == "bool":
-                cur_code += "true" if sub_data else "false"
-            elif field.type.cur == "int":
-                try:
-                    int(sub_data)
-                except ValueError:
-                    sub_data = type_zeros["int"]
-                except TypeError:
-                    sub_data = type_zeros["int"]
-                cur_code += f"{sub_data}"
-            else:
-                cur_code += f"{sub_data or type_zeros[field.type.cur]}"
-            if field.required == "omitempty":
-                cur_code += ")"
-            code += cur_code
-        elif field.type.cur == "map[string]string":
+        kind = field.kind
+        if kind == KIND_STR:
+            out.append(f"{prefix}{field.ptr_open} \"{sub_data or field.zero}\"{field.ptr_close},\n")
+            continue
+        if kind == KIND_BOOL:
+            out.append(f"{prefix}{field.ptr_open}{'true' if sub_data else 'false'}{field.ptr_close},\n")
+            continue
+        if kind == KIND_INT:
+            try:
+                sub_data = int(sub_data)
+            except (TypeError, ValueError):
+                sub_data = type_zeros["int"]
+            out.append(f"{prefix}{field.ptr_open}{sub_data}{field.ptr_close},\n")
+            continue
+        if kind == KIND_FLOAT:
+            out.append(f"{prefix}{field.ptr_open}{sub_data or field.zero}{field.ptr_close},\n")
+            continue
+        out.append(prefix)
+        if kind == KIND_MAP:
             if not sub_data:
-                code += "nil"
+                out.append("nil")
             else:
-                code += "map[string]string{\n"
-                for k, v in sub_data.items():
-                    code += f"\"{k}\": \"{v}\",\n"
-                code += "}\n"
-        elif field.type.cur.startswith("[]"):
+                out.append("map[string]string{\n")
+                out.extend(f"\"{k}\": \"{v}\",\n" for k, v in sub_data.items())
+                out.append("}\n")
+        elif kind == KIND_SLICE:
             if not sub_data:
-                code += "nil"
+                out.append("nil")
             else:
-                code += "[]"+field.type.sub+"{\n"
+                out.append("[]" + field.sub_type + "{\n")
+                sub_struct = field.sub_struct
                 if isinstance(sub_data, list):
                     for p_sub_data in sub_data:
-                        if field.type.sub in structs:
-                            ans = build_go_data(required="required",
-                                                struct=structs[field.type.sub],
-                                                data=p_sub_data)
-                            code += ans
+                        if sub_struct:
+                            _build_go_data("required", sub_struct, p_sub_data, structs, out)
+                        elif field.sub_type == "string":
+                            out.append(f"\"{p_sub_data}\"")
                         else:
-                            if field.type.sub == "string":
-                                code += f"\"{p_sub_data}\""
-                            else:
-                                code += f"{p_sub_data}"
-                        if code.endswith("\n"):
-                            code = code[:-1]
-                        code += ",\n"
+                            out.append(f"{p_sub_data}")
+                        # Items end with ",\n" rather than their own trailing newline.
+                        if out[-1].endswith("\n"):
+                            out[-1] = out[-1][:-1]
+                        out.append(",\n")
                 else:
-                    if field.type.sub in structs:
-                        ans = build_go_data(required="required",
-                                            struct=structs[field.type.sub],
-                                            data=sub_data)
-                        code += ans
+                    if sub_struct:
+                        _build_go_data("required", sub_struct, sub_data, structs, out)
+                    elif field.sub_type == "string":
+                        out.append(f"\"{sub_data}\"")
                     else:
-                        if field.type.sub == "string":
-                            code += f"\"{sub_data}\""
-                        else:
-                            code += f"{sub_data}"
-                code += "}"
+                        out.append(f"{sub_data}")
+                out.append("}")
+        elif not sub_data:
+            # Sparse test data, skip the recursion.
+            out.append(field.sub_empty)
         else:
-            code += build_go_data(required=field.required,
-                                  struct=structs[field.type.cur],
-                                  data=sub_data)
-        code += ",\n"
-    code += "\t}"
-    return code
+            _build_go_data(field.required, field.sub_struct, sub_data, structs, out)
+        out.append(",\n")
+    out.append("\t}")
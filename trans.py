@@ -11,15 +11,32 @@ import ast
 import re
 import os
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import io
+import subprocess
 import gostruct
 
 
-# Used for go struct name deduplication.
-class_set = set()
-# Used for common function association to go validator.
-register_validation = {}
-# Test case data.
-tests_data = {}
+# Pydantic types to Go types, keys are lower case.
+type_map = {
+    "str": "string",
+    "int": "int",
+    "float": "float64",
+    "bool": "bool",
+    "strictstr": "string",
+    "conint": "int",
+    "list": "[]",
+    "ipv6address": "string",
+    "strictint": "int",
+    "strictbool": "bool",
+    "dict": "map[string]string",
+    "datetime": "string",
+    "ipv4address": "string",
+}
+
+# Matches the underscore and the letter following it, e.g. "_a".
+_UNDER_RE = re.compile(r'_(\w)')
 
 # Validator built-in check types.
 validator_built_in_check = {
@@ -35,51 +52,203 @@ validator_built_in_check = {
     "check_cidrs": "dive,cidr,required",
 }
 
+# Fixed fragments of the generated Go code.
+_GO_PKG_HEADER = "package validator\n\n"
+
+_GO_TEST_IMPORTS = "import (\n\t\"testing\"\n\n\t\"github.com/stretchr/testify/assert\"\n)\n\n"
+
+# Test function of a struct, the first case validates the empty struct.
+_GO_TEST_FUNC_BEGIN = (
+    "func Test{name}(t *testing.T) {{\n"
+    "\t// case 1.\n"
+    "\tparam := &{name}{{}}\n"
+    "\terr := ValidateStruct(param)\n"
+    "\tassert.Error(t, err)\n\n"
+)
+
+_GO_CASE_TMPL = "\t// case {i}.\n\tparam = &{literal}\n\terr = ValidateStruct(param)\n\t{assert_}\n\n"
+
+_GO_ASSERT_SUCCESS = "assert.NoError(t, err)"
+
+_GO_ASSERT_FAIL = "assert.Error(t, err)\n\t// TODO: Implement error checking"
+
+_GO_TEST_FUNC_END = "\t// case {i}.\n\t// TODO: need to be implemented.\n\n}}\n\n"
+
+_GO_COMMON_IMPORTS = "import (\n\t\"reflect\"\n\t\"sync\"\n\n\t\"github.com/go-playground/validator/v10\"\n)\n\n"
+
+_GO_COMMON_TEST_IMPORTS = "import (\n\t\"testing\"\n\n\t\"github.com/go-playground/validator/v10\"\n)\n\n"
+
+_GO_COMMON_VARS = "var (\n\tvalidate *validator.Validate\n\tonce sync.Once\n)\n\n"
+
+_GO_GET_VALIDATE_BEGIN = (
+    "func GetValidate() *validator.Validate {\n"
+    "\tonce.Do(func(){\t \n\tvalidate = validator.New()\n\n"
+)
+
+_GO_GET_VALIDATE_END = "\t})\n\n\treturn validate\n}\n\n"
+
+_GO_VALIDATE_STRUCT = (
+    "type CustomChecker interface {\n\tCheck() error \n}\n\n"
+    "func ValidateStruct(s interface{}) error {\n"
+    "\tifaceType := reflect.TypeOf((*CustomChecker)(nil)).Elem()\n"
+    "\tif reflect.TypeOf(s).Implements(ifaceType) {\n"
+    "\t\tfor i := 0; i < ifaceType.NumMethod(); i++ {\n"
+    "\t\t\tmethod := ifaceType.Method(i)\n"
+    "\t\t\tres := reflect.ValueOf(s).MethodByName(method.Name).Call(nil)\n"
+    "\t\t\tif!res[0].IsNil() {\n"
+    "\t\t\t\treturn res[0].Interface().(error)\n"
+    "\t\t\t}\n"
+    "\t\t}\n"
+    "\t}\n"
+    "\treturn GetValidate().Struct(s)\n"
+    "}\n\n"
+)
+
+_GO_PTR_HELPERS = (
+    "\tfunc IntPtr(v int)*int{\n\tans := v\n\treturn &ans\n\t}\n\n"
+    "\tfunc Float64Ptr(v float64)*float64{\n\tans := v\n\treturn &ans\n\t}\n\n"
+    "\tfunc BoolPtr(v bool)*bool{\n\tans := v\n\treturn &ans\n\t}\n\n"
+    "\tfunc StringPtr(v string)*string{\n\tans := v\n\treturn &ans\n\t}\n\n"
+)
+
+_GO_PAGINATION_STRUCT = (
+    "\ttype PaginationParamModel struct {\n"
+    "\tPageNo *int `json:\"page_no\" validate:\"omitempty,gte=1\"`\n"
+    "\tPage *int `json:\"page\" validate:\"omitempty,gte=1\"`\n"
+    "\tPageNumber *int `json:\"page_number\" validate:\"omitempty,gte=1\"`\n"
+    "\tPageSize int `json:\"page_size\" validate:\"required,gte=1,lte=50\"`\n"
+    "\t}\n\n"
+)
+
+
+class ConversionContext(object):
+    """
+    The state shared by the conversion of all files.
+    """
+
+    def __init__(self):
+        # Used for go struct name deduplication.
+        self.class_set = set()
+        # Go structs by name, kept across passes so each class is extracted once.
+        self.structs = {}
+        # Used for common function association to go validator.
+        self.register_validation = {}
+        # Test case data.
+        self.tests_data = {}
+        # Parsed python files, each file is parsed only once.
+        self.ast_cache = {}
+        # Top-level definitions of the parsed files, see analyze.
+        self.analyses = {}
+        # Go struct extracted from each class definition. Names are not
+        # unique, so reuse across passes is keyed by the cached AST node.
+        self.class_structs = {}
+
+
+def _parse(ctx: ConversionContext, file_path: str):
+    """
+    Parse a Python file, reusing the tree if it was already parsed.
+
+    Args:
+        ctx (ConversionContext): The conversion state.
+        file_path (str): The path to the Python file.
+
+    Returns:
+        ast.Module: The parsed module.
+    """
+    tree = ctx.ast_cache.get(file_path)
+    if tree is None:
+        with open(file_path, 'r', encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=file_path)
+        ctx.ast_cache[file_path] = tree
+    return tree
+
 
-def generate_struct_name(class_def: ast.ClassDef, filename: str):
+def analyze(tree: ast.Module, kinds=("classes", "funcs")):
+    """
+    Collect the top-level definitions of a module in a single pass.
+
+    Args:
+        tree (ast.Module): The parsed module.
+        kinds (Tuple[str]): The definitions to collect, "classes" and/or "funcs".
+
+    Returns:
+        dict: The class definitions under "classes" and the function
+            definitions under "funcs".
+    """
+    out = {"classes": [], "funcs": []}
+    want_classes, want_funcs = "classes" in kinds, "funcs" in kinds
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            if want_classes:
+                out["classes"].append(node)
+        elif isinstance(node, ast.FunctionDef):
+            if want_funcs:
+                out["funcs"].append(node)
+    return out
+
+
+def _analyze_file(ctx: ConversionContext, file_path: str):
+    """
+    Parse and analyze a Python file, reusing earlier results.
+
+    Args:
+        ctx (ConversionContext): The conversion state.
+        file_path (str): The path to the Python file.
+
+    Returns:
+        dict: The top-level definitions, see analyze.
+    """
+    analysis = ctx.analyses.get(file_path)
+    if analysis is None:
+        analysis = analyze(_parse(ctx, file_path))
+        ctx.analyses[file_path] = analysis
+    return analysis
+
+
+def generate_struct_name(ctx: ConversionContext, class_def: ast.ClassDef, file_prefix: str):
     """
     Generate a unique class name for the given Pydantic class definition.
 
     Args:
+        ctx (ConversionContext): The conversion state.
         class_def (ast.ClassDef): The Pydantic class definition.
-        filename (str): The name of the Python file containing the class.
+        file_prefix (str): The camelCase name of the Python file containing the class.
 
     Returns:
         str: The unique class name.
     """
     class_name = class_def.name
-    if class_name in class_set:
-        class_name = generate_name_with_file(class_name, filename)
-    class_set.add(class_name)
+    if class_name in ctx.class_set:
+        class_name = generate_name_with_file(class_name, file_prefix)
+    ctx.class_set.add(class_name)
     return class_name
 
 
-def generate_name_with_file(name: str, filename: str):
+def generate_name_with_file(name: str, file_prefix: str):
     """
     Generate a unique class name for the given Pydantic class definition.
 
     Args:
         name (str): The base class name.
-        filename (str): The name of the Python file containing the class.
+        file_prefix (str): The camelCase name of the Python file containing
+            the class, see underline2hump.
 
     Returns:
         str: The unique class name.
     """
-    return underline2hump(filename)+name
+    return file_prefix+name
 
 
-def build_tests_data(file_path: str):
+def build_tests_data(ctx: ConversionContext, file_path: str):
     """
     Parse the test file and extract the test data.
 
     Args:
+        ctx (ConversionContext): The conversion state.
         file_path (str): The path to the test file.
     """
-    with open(file_path, 'r', encoding="utf-8") as f:
-        tree = ast.parse(f.read(), filename=file_path)
-    for node in tree.body:
-        if not isinstance(node, ast.ClassDef):
-            continue
+    file_prefix = underline2hump(file_path.split('/')[-1][:-3])
+    for node in _analyze_file(ctx, file_path)["classes"]:
         for func_node in node.body:  # ast.FuncDef
             success_data, fail_data = [], []
             class_name = ""
@@ -94,10 +263,9 @@ def build_tests_data(file_path: str):
                         continue
                     class_name = node.body[0].value.func.id if not class_name else class_name
                     fail_data.append(build_case_test_data(node))
-            if class_name in tests_data:
-                class_name = generate_name_with_file(class_name,
-                                                     file_path.split('/')[-1][:-3])
-            tests_data[class_name] = {
+            if class_name in ctx.tests_data:
+                class_name = generate_name_with_file(class_name, file_prefix)
+            ctx.tests_data[class_name] = {
                 "success_data": success_data,
                 "fail_data": fail_data,
             }
@@ -148,26 +316,19 @@ def pydantic_to_go_type(pydantic_type):
     Convert a Pydantic type to a Go type.
 
     Args:
-        pydantic_type (str): The Pydantic type, e.g., "str", "int", "List[str]".
+        pydantic_type (List[str]): The Pydantic type tokens, e.g., ["List", "str"].
 
     Returns:
         str: The Go type, e.g., "string", "int", "[]string".
     """
-    type_map = {
-        "str": "string",
-        "int": "int",
-        "float": "float64",
-        "bool": "bool",
-        "strictstr": "string",
-        "conint": "int",
-        "list": "[]",
-        "ipv6address": "string",
-        "strictint": "int",
-        "strictbool": "bool",
-        "dict": "map[string]string",
-        "datetime": "string",
-        "ipv4address": "string",
-    }
+    return _pydantic_to_go_type(tuple(pydantic_type))
+
+
+@functools.lru_cache(maxsize=None)
+def _pydantic_to_go_type(pydantic_type: tuple):
+    """
+    Convert a tuple of Pydantic type tokens to a Go type, see pydantic_to_go_type.
+    """
     go_type = ""
     for val in pydantic_type:
         if val == "Optional":
@@ -176,49 +337,40 @@ def pydantic_to_go_type(pydantic_type):
     return go_type
 
 
-def extract_pydantic_classes(file_path):
+def extract_pydantic_classes(ctx, file_path):
     """
     Extract the Pydantic classes from a Python file.
 
+    :param ctx: The conversion state.
+    :type ctx: ConversionContext
     :param file_path: The path to the Python file.
     :type file_path: str
     :return: A list of Pydantic class definitions.
     :rtype: list
     """
-    with open(file_path, 'r', encoding="utf-8") as f:
-        tree = ast.parse(f.read(), filename=file_path)
-
-    pydantic_classes = []
-    for node in tree.body:
-        if isinstance(node, ast.ClassDef):
-            pydantic_classes.append(node)
-    return pydantic_classes
+    return _analyze_file(ctx, file_path)["classes"]
 
 
-def extract_common_functions(file_path):
+def extract_common_functions(ctx, file_path):
     """
     Extract the common functions from a Python file.
 
     Args:
+        ctx (ConversionContext): The conversion state.
         file_path (str): The path to the Python file.
 
     Returns:
         List[ast.FunctionDef]: A list of common function definitions.
     """
-    with open(file_path, 'r', encoding="utf-8") as f:
-        tree = ast.parse(f.read(), filename=file_path)
+    return _analyze_file(ctx, file_path)["funcs"]
 
-    functions = []
-    for node in tree.body:
-        if isinstance(node, ast.FunctionDef):
-            functions.append(node)
-    return functions
 
-
-def extract_pydantic_fields(class_name, class_def):
+def extract_pydantic_fields(ctx, class_name, class_def):
     """Extract the Pydantic fields from a class definition.
 
     Args:
+        ctx (ConversionContext): The conversion state, the go struct is registered in it.
+        class_name (str): The go struct name.
         class_def (ast.ClassDef): The Pydantic class definition.
 
     Returns:
@@ -256,7 +408,9 @@ def extract_pydantic_fields(class_name, class_def):
             pass
         elif isinstance(field, ast.FunctionDef):
             pass
-    gostruct.structs[class_name] = gostruct.Struct(class_name, gostruct_fields)
+    struct = gostruct.Struct(class_name, gostruct_fields)
+    ctx.structs[class_name] = struct
+    ctx.class_structs[class_def] = struct
     return fields
 
 
@@ -335,38 +489,62 @@ def build_tag(field, field_types, kws, customs: dict):
     return required, json, "`json:\"" + json + "\" validate:\"" + ",".join(validations) + "\"`"
 
 
-def convert_pydantic_to_go(pydantic_classes, filename: str):
+def prepare_pydantic_classes(ctx: ConversionContext, pydantic_classes, file_prefix: str):
     """
-    Convert a list of Pydantic class definitions to Go code.
+    Name the go structs of the Pydantic classes and extract their fields.
+
+    Names depend on the files converted before, so this runs in order
+    over all files before any of them is converted.
 
     Args:
+        ctx (ConversionContext): The conversion state.
         pydantic_classes (List[ast.ClassDef]): The list of Pydantic class definitions.
-        filename (str): The name of the Python file containing the Pydantic classes.
+        file_prefix (str): The camelCase name of the Python file containing the Pydantic classes.
 
     Returns:
-        str: The Go code.
+        List[Tuple[str, ast.ClassDef, gostruct.Struct]]: The go struct name,
+            definition and go struct of each class.
     """
-    go_code = ""
-    go_code_pkg = "package validator\n\n"
+    classes = []
+    for class_def in pydantic_classes:
+        # Verify whether go struct is repeatedly defined.
+        class_name = generate_struct_name(ctx, class_def, file_prefix)
+        # The struct may already have been extracted from this class by the tests pass.
+        struct = ctx.class_structs.get(class_def)
+        if struct is not None and struct.name == class_name:
+            ctx.structs[class_name] = struct
+        else:
+            extract_pydantic_fields(ctx, class_name, class_def)
+            struct = ctx.structs[class_name]
+        classes.append((class_name, class_def, struct))
+    return classes
 
-    go_code_import = "import (\n"
-    go_code_import_end = ")\n\n"
 
-    go_code_import_net = "\"net\"\n"
-    go_code_import_time = "\"time\"\n"
+def convert_pydantic_to_go(ctx: ConversionContext, classes):
+    """
+    Convert a list of Pydantic class definitions to Go code.
 
-    go_test_code = "package validator\n\n"
-    go_test_code += "import (\n\t\"testing\"\n\n\t\"github.com/stretchr/testify/assert\"\n)\n\n"
+    Args:
+        ctx (ConversionContext): The conversion state.
+        classes (List[Tuple[str, ast.ClassDef, gostruct.Struct]]): The named
+            Pydantic class definitions, see prepare_pydantic_classes.
 
-    for class_def in pydantic_classes:
-        # Verify whether go struct is repeatedly defined.
-        class_name = generate_struct_name(class_def, filename)
+    Returns:
+        str: The Go code.
+    """
+    buf, test_buf = io.StringIO(), io.StringIO()
+    w, tw = buf.write, test_buf.write
 
-        class_test_data = tests_data.get(class_name, {})
+    tw(_GO_PKG_HEADER)
+    tw(_GO_TEST_IMPORTS)
+
+    # Packages used by the emitted field types.
+    uses_net = uses_time = False
+    for class_name, class_def, struct in classes:
+        class_test_data = ctx.tests_data.get(class_name, {})
         success_data = class_test_data.get("success_data", [])
         fail_data = class_test_data.get("fail_data", [])
-        print(class_name)
-        go_code += f"type {class_name} struct {{\n"
+        w(f"type {class_name} struct {{\n")
 
         parents = ""
         if isinstance(class_def, ast.Name):
@@ -374,78 +552,65 @@ def convert_pydantic_to_go(pydantic_classes, filename: str):
         else:
             parents = class_def.bases[0].id
         if "PaginationGetParamModel" in parents or "PaginationPostParamModel" in parents:
-            go_code += "\tPaginationParamModel\n"
-
-        fields = extract_pydantic_fields(class_name, class_def)
-        for field_name, field_type, tag, _, required in fields:
-            filed_type_go = pydantic_to_go_type(field_type)
-            go_code += f"\t{underline2hump(field_name)} "
+            w("\tPaginationParamModel\n")
+
+        for field in struct.fields:
+            filed_type_go = field.type.cur
+            if "net." in filed_type_go:
+                uses_net = True
+            if "time." in filed_type_go:
+                uses_time = True
+            w(f"\t{field.name} ")
             # Using pointers to resolve ambiguities.
             # List and Map types do not require pointers.
-            if required == "omitempty" and not filed_type_go.startswith("[]") \
+            if field.required == "omitempty" and not filed_type_go.startswith("[]") \
                     and not filed_type_go.startswith("map["):
-                go_code += "*"
-            go_code += f"{filed_type_go} " + tag + "\n"
-        go_code += "}\n\n"
+                w("*")
+            w(f"{filed_type_go} " + field.tag + "\n")
+        w("}\n\n")
         func_names = []
         for t in class_def.body:
             if isinstance(t, ast.FunctionDef):
                 func_name = underline2hump(t.name)
                 func_names.append(func_name)
-                go_code += f"func (p *{class_name}){func_name} () error " + "{ \n" + \
-                    "// TODO: need to be implemented. \n\n\treturn nil \n}\n\n"
+                w(f"func (p *{class_name}){func_name} () error " + "{ \n" +
+                  "// TODO: need to be implemented. \n\n\treturn nil \n}\n\n")
         if func_names:
-            go_code += f"func (p *{class_name})Check () error " + "{ \n"
+            w(f"func (p *{class_name})Check () error " + "{ \n")
             for func_name in func_names:
-                go_code += f"\tif err := p.{func_name}(); err != nil "+"{\n"
-                go_code += "\t\treturn err\n}\n\n"
-            go_code += "\treturn nil \n}\n\n"
+                w(f"\tif err := p.{func_name}(); err != nil "+"{\n")
+                w("\t\treturn err\n}\n\n")
+            w("\treturn nil \n}\n\n")
         # generate test code.
-        go_test_code += f"func Test{class_name}(t *testing.T) {{\n"
-        go_test_code += f"\t// case {1}.\n"
-        go_test_code += f"\tparam := &{class_name}"+"{}\n"
-        go_test_code += "\terr := ValidateStruct(param)\n"
-        go_test_code += "\tassert.Error(t, err)\n\n"
+        tw(_GO_TEST_FUNC_BEGIN.format(name=class_name))
         i = 2
         # success test cases.
         for success in success_data:
-            go_test_code += f"\t// case {i}.\n"
-            go_test_code += "\tparam = &"
-            go_test_code += gostruct.build_go_data("required",
-                                                   gostruct.structs[class_name],
-                                                   success)
-
-            go_test_code += "\n\terr = ValidateStruct(param)\n"
-            go_test_code += "\tassert.NoError(t, err)\n\n"
+            tw(_GO_CASE_TMPL.format(i=i,
+                                    literal=gostruct.build_go_data("required", struct, success, ctx.structs),
+                                    assert_=_GO_ASSERT_SUCCESS))
             i += 1
         # failed test cases.
-        for success in fail_data:
-            go_test_code += f"\t// case {i}.\n"
-            go_test_code += "\tparam = &"
-            go_test_code += gostruct.build_go_data("required",
-                                                   gostruct.structs[class_name],
-                                                   success)
-
-            go_test_code += "\n\terr = ValidateStruct(param)\n"
-            go_test_code += "\tassert.Error(t, err)\n"
-            go_test_code += "\t// TODO: Implement error checking\n\n"
+        for fail in fail_data:
+            tw(_GO_CASE_TMPL.format(i=i,
+                                    literal=gostruct.build_go_data("required", struct, fail, ctx.structs),
+                                    assert_=_GO_ASSERT_FAIL))
             i += 1
-        go_test_code += f"\t// case {i}.\n"
-        go_test_code += "\t// TODO: need to be implemented.\n\n"
-        go_test_code += "}\n\n"
-    ans = go_code_pkg
-    if "net." in go_code or "time." in go_code:
-        ans += go_code_import
-    if "net." in go_code:
-        ans += go_code_import_net
-    if "time." in go_code:
-        ans += go_code_import_time
-    if "net." in go_code or "time." in go_code:
-        ans += go_code_import_end
-    ans += go_code
-    return ans, go_test_code
-
-
+        tw(_GO_TEST_FUNC_END.format(i=i))
+    ans = _GO_PKG_HEADER
+    if uses_net or uses_time:
+        ans += "import (\n"
+    if uses_net:
+        ans += "\"net\"\n"
+    if uses_time:
+        ans += "\"time\"\n"
+    if uses_net or uses_time:
+        ans += ")\n\n"
+    ans += buf.getvalue()
+    return ans, test_buf.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
 def underline2hump(underline_str: str):
     """
     Convert an underscore separated string to camelCase.
@@ -456,77 +621,139 @@ def underline2hump(underline_str: str):
     Returns:
         str: The camelCase string.
     """
-    sub = re.sub(r'(_\w)', lambda x: x.group(1)[1].upper(), underline_str)
+    sub = _UNDER_RE.sub(lambda x: x.group(1).upper(), underline_str)
     sub1, sub2 = sub[:1], sub[1:]
     return sub1.capitalize() + sub2
 
 
-def convert_functions_to_go(functions):
+def convert_functions_to_go(ctx: ConversionContext, functions):
     """
     Convert a list of Python functions to Go code.
 
     Args:
+        ctx (ConversionContext): The conversion state.
         functions (List[ast.FunctionDef]): The list of Python function definitions.
 
     Returns:
         str: The Go code.
     """
-    go_code_pkg, go_test_code = "package validator\n\n", "package validator\n\n"
-    go_code_import = "import (\n\t\"reflect\"\n\t\"sync\"\n\n\t\"github.com/go-playground/validator/v10\"\n)\n\n"
-    go_code_var = "var (\n\tvalidate *validator.Validate\n\tonce sync.Once\n)\n\n"
-    go_code = ""
-
-    go_test_code += "import (\n\t\"testing\"\n\n\t\"github.com/go-playground/validator/v10\"\n)\n\n"
-
-    go_code += "type CustomChecker interface {\n\tCheck() error \n}\n\n"
-    go_code += "func ValidateStruct(s interface{}) error {\n"
-    go_code += "\tifaceType := reflect.TypeOf((*CustomChecker)(nil)).Elem()\n"
-    go_code += "\tif reflect.TypeOf(s).Implements(ifaceType) {\n"
-    go_code += "\t\tfor i := 0; i < ifaceType.NumMethod(); i++ {\n"
-    go_code += "\t\t\tmethod := ifaceType.Method(i)\n"
-    go_code += "\t\t\tres := reflect.ValueOf(s).MethodByName(method.Name).Call(nil)\n"
-    go_code += "\t\t\tif!res[0].IsNil() {\n"
-    go_code += "\t\t\t\treturn res[0].Interface().(error)\n"
-    go_code += "\t\t\t}\n"
-    go_code += "\t\t}\n"
-    go_code += "\t}\n"
-    go_code += "\treturn GetValidate().Struct(s)\n"
-    go_code += "}\n\n"
-
-    go_code += "\tfunc IntPtr(v int)*int{\n\tans := v\n\treturn &ans\n\t}\n\n"
-    go_code += "\tfunc Float64Ptr(v float64)*float64{\n\tans := v\n\treturn &ans\n\t}\n\n"
-    go_code += "\tfunc BoolPtr(v bool)*bool{\n\tans := v\n\treturn &ans\n\t}\n\n"
-    go_code += "\tfunc StringPtr(v string)*string{\n\tans := v\n\treturn &ans\n\t}\n\n"
-    go_code += "\ttype PaginationParamModel struct {\n"
-    go_code += "\tPageNo *int `json:\"page_no\" validate:\"omitempty,gte=1\"`\n"
-    go_code += "\tPage *int `json:\"page\" validate:\"omitempty,gte=1\"`\n"
-    go_code += "\tPageNumber *int `json:\"page_number\" validate:\"omitempty,gte=1\"`\n"
-    go_code += "\tPageSize int `json:\"page_size\" validate:\"required,gte=1,lte=50\"`\n"
-    go_code += "\t}\n\n"
+    buf, test_buf = io.StringIO(), io.StringIO()
+    w, tw = buf.write, test_buf.write
+
+    tw(_GO_PKG_HEADER)
+    tw(_GO_COMMON_TEST_IMPORTS)
+
+    w(_GO_VALIDATE_STRUCT)
+    w(_GO_PTR_HELPERS)
+    w(_GO_PAGINATION_STRUCT)
 
     for func in functions:
         func_name = underline2hump(func.name)
-        register_validation[func.name] = func_name
-        go_code += f"func {func_name} (fl validator.FieldLevel) bool " + "{ \n" + \
-            "// TODO: need to be implemented. \n\n\treturn true \n}\n\n"
-        go_test_code += f"func Test{func_name}(t *testing.T) {{\n"
-        go_test_code += "\t// case 1.\n"
-        go_test_code += "\tvar param validator.FieldLevel"+"\n\n"
-        go_test_code += "\t// TODO: need to be implemented. \n\n"
-        go_test_code += f"\terr := {func_name}(param)\n" +\
-            "\tt.Error(err)\n}\n\n"
-    ans = go_code_pkg+go_code_import+go_code_var +\
-        "func GetValidate() *validator.Validate {\n" \
-        + "\tonce.Do(func(){\t \n\tvalidate = validator.New()\n\n"
-
-    for k, v in register_validation.items():
+        ctx.register_validation[func.name] = func_name
+        w(f"func {func_name} (fl validator.FieldLevel) bool " + "{ \n" +
+          "// TODO: need to be implemented. \n\n\treturn true \n}\n\n")
+        tw(f"func Test{func_name}(t *testing.T) {{\n")
+        tw("\t// case 1.\n")
+        tw("\tvar param validator.FieldLevel"+"\n\n")
+        tw("\t// TODO: need to be implemented. \n\n")
+        tw(f"\terr := {func_name}(param)\n" +
+           "\tt.Error(err)\n}\n\n")
+    ans = _GO_PKG_HEADER + _GO_COMMON_IMPORTS + _GO_COMMON_VARS + _GO_GET_VALIDATE_BEGIN
+
+    for k, v in ctx.register_validation.items():
         ans += f"\tvalidate.RegisterValidation(\"{k}\", {v})\n"
 
-    ans += "\t})\n\n"
+    ans += _GO_GET_VALIDATE_END
+    ans += buf.getvalue()
+    return ans, test_buf.getvalue()
+
 
-    ans += "\treturn validate\n}\n\n"
-    ans += go_code
-    return ans, go_test_code
+def _iter_py(root: str, predicate):
+    """
+    Collect the files under a directory whose name matches the predicate.
+
+    Directories are visited top-down in the same order as os.walk, and
+    unreadable directories are skipped.
+
+    Args:
+        root (str): The directory to walk.
+        predicate (Callable[[str], bool]): Filter on the file name.
+
+    Returns:
+        List[Tuple[str, str]]: The (directory, file name) of the matched files.
+    """
+    matched, dirs = [], []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file() and predicate(entry.name):
+                    matched.append((root, entry.name))
+    except OSError:
+        return matched
+    for name in dirs:
+        matched.extend(_iter_py(os.path.join(root, name), predicate))
+    return matched
+
+
+def _gofmt(files):
+    """
+    Format the generated Go files with a single gofmt run.
+
+    Args:
+        files (List[str]): The Go files to format in place.
+    """
+    if not files:
+        return
+    try:
+        subprocess.run(["gofmt", "-w", *files], check=False)
+    except OSError as e:
+        print(f"gofmt failed: {e}")
+
+
+def _convert_one_file(ctx: ConversionContext, job):
+    """
+    Convert the classes of one Python file and write the Go files.
+
+    Args:
+        ctx (ConversionContext): The conversion state.
+        job (Tuple[str, str, list]): The destination
+            directory, the output file name and the named classes.
+
+    Returns:
+        Tuple[str, str]: The paths of the Go code and Go test files.
+    """
+    dest, filename, classes = job
+    go_code, go_test_code = convert_pydantic_to_go(ctx, classes)
+    code_file = dest+"/"+filename+".go"
+    with open(code_file, 'w', encoding="utf-8") as f:
+        f.write(go_code)
+    code_test_file = dest+"/"+filename+"_test.go"
+    with open(code_test_file, 'w', encoding="utf-8") as test_file:
+        test_file.write(go_test_code)
+    return code_file, code_test_file
+
+
+# Conversion state of a worker process, see _init_worker.
+_worker_ctx = None
+
+
+def _init_worker(structs: dict, tests_data: dict):
+    """
+    Set up a worker process with a snapshot of the extracted structs and test data.
+    """
+    global _worker_ctx
+    _worker_ctx = ConversionContext()
+    _worker_ctx.structs = structs
+    _worker_ctx.tests_data = tests_data
+
+
+def _convert_in_worker(job):
+    """
+    Convert one Python file in a worker process, see _convert_one_file.
+    """
+    return _convert_one_file(_worker_ctx, job)
 
 
 def main(path: str, dest: str, file: str, common: str, tests: str):
@@ -543,60 +770,93 @@ def main(path: str, dest: str, file: str, common: str, tests: str):
     if not os.path.exists(dest):
         os.makedirs(dest)
 
+    ctx = ConversionContext()
+    # Generated files, formatted together at the end.
+    produced_files = []
+
     if common:
-        functions = extract_common_functions(common)
-        go_code, go_test_code = convert_functions_to_go(functions)
+        functions = extract_common_functions(ctx, common)
+        go_code, go_test_code = convert_functions_to_go(ctx, functions)
         with open("./validator/common.go", 'w', encoding="utf-8") as f:
             f.write(go_code)
         with open("./validator/common_test.go", 'w', encoding="utf-8") as f:
             f.write(go_test_code)
+        produced_files += ["./validator/common.go", "./validator/common_test.go"]
 
-        os.system("gofmt -w ./validator/common.go & gofmt -w ./validator/common_test.go")
+    sources = _iter_py(path, lambda name: file in name)
 
     if tests:
-        for root, _, files in os.walk(tests):
-            for name in files:
-                if name.endswith(".py") and name.startswith("test_"):
-                    build_tests_data(root+'/'+name)
-
-        for root, _, files in os.walk(path):
-            for name in files:
-                if file in name:
-                    if root == ".":
-                        filename = name
-                    elif "/" in root:
-                        filename = root.split("/")[-1]
-                    else:
-                        filename = name
-                    pydantic_classes = extract_pydantic_classes(root+'/' + file)
-                    for class_def in pydantic_classes:
-                        class_name = generate_struct_name(class_def, filename)
-                        extract_pydantic_fields(class_name, class_def)
-
-        class_set.clear()
-
-    for root, _, files in os.walk(path):
-        for name in files:
-            if file in name:
-                print("Begin to convert: \n" + root + '/'+file + ': \n\nThese classes are being converted:')
-                pydantic_classes = extract_pydantic_classes(root+'/' + file)
-                if root == ".":
-                    filename = name
-                elif "/" in root:
-                    filename = root.split("/")[-1]
-                else:
-                    filename = name
-                go_code, go_test_code = convert_pydantic_to_go(pydantic_classes, filename)
-                code_file = dest+"/"+filename+".go"
-                with open(code_file, 'w', encoding="utf-8") as f:
-                    f.write(go_code)
-                code_test_file = dest+"/"+filename+"_test.go"
-                with open(code_test_file, 'w', encoding="utf-8") as test_file:
-                    test_file.write(go_test_code)
-
-                os.system("gofmt -w "+code_file + " & gofmt -w "+code_test_file)
-                print(f"\nConverted:\n {code_file}\n{code_test_file}\n")
-                print("---------------------------------------------------\n\n")
+        test_files = _iter_py(tests, lambda name: name.endswith(".py") and name.startswith("test_"))
+        for root, name in test_files:
+            build_tests_data(ctx, root+'/'+name)
+
+        for root, name in sources:
+            if root == ".":
+                filename = name
+            elif "/" in root:
+                filename = root.split("/")[-1]
+            else:
+                filename = name
+            file_prefix = underline2hump(filename)
+            pydantic_classes = extract_pydantic_classes(ctx, root+'/' + file)
+            for class_def in pydantic_classes:
+                class_name = generate_struct_name(ctx, class_def, file_prefix)
+                extract_pydantic_fields(ctx, class_name, class_def)
+
+        # Names are generated again in the same order below, the
+        # extracted structs are kept and reused.
+        ctx.class_set.clear()
+
+    # Naming and extraction run in order, the files are then
+    # converted independently.
+    jobs, roots = [], []
+    for root, name in sources:
+        if root == ".":
+            filename = name
+        elif "/" in root:
+            filename = root.split("/")[-1]
+        else:
+            filename = name
+        pydantic_classes = extract_pydantic_classes(ctx, root+'/' + file)
+        classes = prepare_pydantic_classes(ctx, pydantic_classes, underline2hump(filename))
+        jobs.append((dest, filename, classes))
+        roots.append(root)
+
+    # Sources with the same output file overwrote each other when
+    # converted in order, only the last one of them is converted.
+    last_job = {}
+    for i, (_, filename, _) in enumerate(jobs):
+        last_job[filename] = i
+    results = [None] * len(jobs)
+    try:
+        if len(last_job) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(last_job), os.cpu_count() or 1),
+                                     initializer=_init_worker,
+                                     initargs=(ctx.structs, ctx.tests_data)) as ex:
+                futures = {i: ex.submit(_convert_in_worker, jobs[i]) for i in sorted(last_job.values())}
+            for i, future in futures.items():
+                if future.exception() is None:
+                    results[i] = future.result()
+            # Raise the first failure, once the other files are collected.
+            for future in futures.values():
+                future.result()
+        else:
+            for i in last_job.values():
+                results[i] = _convert_one_file(ctx, jobs[i])
+    finally:
+        # Report and format the files written so far, even on failure.
+        for i, (root, (_, filename, classes)) in enumerate(zip(roots, jobs)):
+            written = results[last_job[filename]]
+            if written is None:
+                continue
+            print("Begin to convert: \n" + root + '/'+file + ': \n\nThese classes are being converted:')
+            for class_name, _, _ in classes:
+                print(class_name)
+            if results[i] is not None:
+                produced_files += list(written)
+            print(f"\nConverted:\n {written[0]}\n{written[1]}\n")
+            print("---------------------------------------------------\n\n")
+        _gofmt(produced_files)
 
 
 if __name__ == "__main__":